@@ -0,0 +1,205 @@
+"""
+Análisis de conflictos LL(1) y SLR(1).
+Reúne todos los conflictos de ambas tablas en una sola pasada, los agrupa
+por producción y genera, para cada uno, la cadena más corta que lo provoca
+recorriendo el autómata LR(0) desde el estado inicial.
+
+La búsqueda de ejemplos está acotada en tiempo (segundos) y en número de
+estados LR(0) que guarda la búsqueda; si se agota algún límite, los
+conflictos se reportan igual pero sin ejemplo (y, en los shift/reduce, sin
+las producciones del lado del shift). Estos límites no acotan la
+construcción del autómata ni de las tablas, que ya deben estar completas.
+"""
+
+import heapq
+import time
+from collections import defaultdict
+
+
+class AnalizadorConflictos:
+    def __init__(self, gramatica, ll1, slr1, limite_tiempo=1.0, limite_busqueda=20000):
+        """
+        limite_tiempo: segundos para generar ejemplos.
+        limite_busqueda: máximo de estados LR(0) alcanzados por la búsqueda.
+        """
+        self.g = gramatica
+        self.ll1 = ll1
+        self.slr1 = slr1
+        self.limite_tiempo = limite_tiempo
+        self.limite_busqueda = limite_busqueda
+        self.truncado = False
+        self._limite = None
+
+    # ==========================
+    #     Reporte completo
+    # ==========================
+    def analizar(self):
+        """
+        Devuelve un diccionario con todos los conflictos LL(1) y SLR(1),
+        su agrupación por producción y un ejemplo mínimo para cada uno.
+        """
+        self._limite = time.perf_counter() + self.limite_tiempo
+        self.truncado = False
+        self.slr1.completar()
+
+        conflictos_ll1 = self._conflictos_ll1()
+        conflictos_slr1 = self._conflictos_slr1()
+        if not conflictos_ll1 and not conflictos_slr1:
+            # Sin conflictos no hay ejemplos que buscar
+            return {"ll1": [], "slr1": [], "por_produccion": {}, "truncado": False}
+
+        # Ejemplos: derivación mínima de cada símbolo + camino más corto en LR(0)
+        derivaciones = self._derivaciones_minimas()
+        distancia, padre = self._caminos_minimos(derivaciones)
+
+        predichos = {}  # no terminal -> estado más cercano donde se predice
+        buscados = {c["no_terminal"] for c in conflictos_ll1}
+        for i in sorted(distancia, key=distancia.get) if buscados else ():
+            if self._agotado():
+                break
+            for (A, rhs, dot) in self.slr1.items_de_estado(i):
+                if dot == 0 and A in buscados and A not in predichos:
+                    predichos[A] = i
+            if len(predichos) == len(buscados):
+                break
+
+        for c in conflictos_ll1:
+            estado = predichos.get(c["no_terminal"])
+            c["ejemplo"] = self._ejemplo(estado, c["terminal"], padre, derivaciones)
+        for c in conflictos_slr1:
+            estado = c["estado"] if c["estado"] in distancia else None
+            c["ejemplo"] = self._ejemplo(estado, c["simbolo"], padre, derivaciones)
+
+        por_produccion = defaultdict(list)
+        for c in conflictos_ll1:
+            for p in c["producciones"]:
+                por_produccion[p].append(f"LL(1) [{c['no_terminal']}, {c['terminal']}]")
+        for c in conflictos_slr1:
+            for p in c["producciones"]:
+                por_produccion[p].append(f"SLR(1) {c['tipo']} en estado {c['estado']}, símbolo '{c['simbolo']}'")
+
+        return {
+            "ll1": conflictos_ll1,
+            "slr1": conflictos_slr1,
+            "por_produccion": dict(por_produccion),
+            "truncado": self.truncado,
+        }
+
+    # ==========================
+    #   Recolección de conflictos
+    # ==========================
+    def _conflictos_ll1(self):
+        conflictos = []
+        for (A, a), alternativas in self.ll1.conflictos.items():
+            conflictos.append({
+                "no_terminal": A,
+                "terminal": a,
+                "producciones": [self._texto_produccion(A, rhs) for rhs in alternativas],
+            })
+        return conflictos
+
+    def _conflictos_slr1(self):
+        conflictos = []
+        for i in sorted(self.slr1.tabla_action):
+            items = None
+            for a, acciones in sorted(self.slr1.tabla_action[i].items()):
+                if len(acciones) < 2:
+                    continue
+                producciones = []
+                if any(x.startswith("shift") for x in acciones) and not self._agotado():
+                    # Ítems A -> α • a β que provocan el shift (en modo compacto
+                    # items_de_estado rehace la clausura: una vez por estado)
+                    if items is None:
+                        items = self.slr1.items_de_estado(i)
+                    for (A, rhs, dot) in items:
+                        if dot < len(rhs) and rhs[dot] == a:
+                            producciones.append(self._texto_produccion(A, rhs))
+                for x in acciones:
+                    if x.startswith("reduce"):
+                        A, rhs = self.slr1.producciones_numeradas[int(x.split()[1]) - 1]
+                        producciones.append(self._texto_produccion(A, rhs))
+                reduces = sum(1 for x in acciones if x.startswith("reduce"))
+                conflictos.append({
+                    "estado": i,
+                    "simbolo": a,
+                    "acciones": list(acciones),
+                    "tipo": "reduce/reduce" if reduces == len(acciones) else "shift/reduce",
+                    "producciones": sorted(set(producciones)),
+                })
+        return conflictos
+
+    def _texto_produccion(self, A, rhs):
+        return f"{A} -> {' '.join(rhs) if rhs else 'e'}"
+
+    # ==========================
+    #   Generación de ejemplos
+    # ==========================
+    def _agotado(self):
+        if time.perf_counter() > self._limite:
+            self.truncado = True
+        return self.truncado
+
+    def _derivaciones_minimas(self):
+        """
+        Para cada símbolo, la cadena de terminales más corta que deriva.
+        Los no terminales improductivos no aparecen en el resultado.
+        """
+        derivaciones = {t: (t,) for t in self.g.terminales}
+        cambiado = True
+        while cambiado and not self._agotado():
+            cambiado = False
+            for A, rhs in self.g.obtener_todas_producciones():
+                if any(X not in derivaciones for X in rhs):
+                    continue
+                candidata = tuple(t for X in rhs for t in derivaciones[X])
+                actual = derivaciones.get(A)
+                if actual is None or len(candidata) < len(actual):
+                    derivaciones[A] = candidata
+                    cambiado = True
+        return derivaciones
+
+    def _caminos_minimos(self, derivaciones):
+        """
+        Búsqueda de costo uniforme sobre el autómata LR(0): el costo de una
+        transición por X es la longitud de la derivación mínima de X.
+        Devuelve (distancia, padre) con padre[j] = (i, X).
+        """
+        adyacencia = defaultdict(list)
+        for (i, X), j in self.slr1.transiciones():
+            if X in derivaciones:
+                adyacencia[i].append((X, j))
+
+        distancia = {0: 0}
+        padre = {}
+        cola = [(0, 0)]
+        while cola:
+            d, i = heapq.heappop(cola)
+            if d > distancia[i]:
+                continue
+            if self._agotado():
+                break
+            for X, j in adyacencia[i]:
+                nd = d + len(derivaciones[X])
+                if j not in distancia and len(distancia) >= self.limite_busqueda:
+                    self.truncado = True
+                    continue
+                if nd < distancia.get(j, nd + 1):
+                    distancia[j] = nd
+                    padre[j] = (i, X)
+                    heapq.heappush(cola, (nd, j))
+        return distancia, padre
+
+    def _ejemplo(self, estado, terminal, padre, derivaciones):
+        """
+        Cadena que lleva del estado inicial a `estado` seguida de `terminal`.
+        """
+        if estado is None:
+            return None
+        simbolos = []
+        while estado in padre:
+            estado, X = padre[estado]
+            simbolos.append(X)
+        tokens = [t for X in reversed(simbolos) for t in derivaciones[X]]
+        if terminal != '$':
+            tokens.append(terminal)
+        return " ".join(tokens)
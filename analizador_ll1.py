@@ -4,13 +4,18 @@ Construye la tabla LL(1) y permite analizar cadenas.
 Compatible con la clase Gramatica y el cálculo de Primeros/Siguientes.
 """
 
+from primeros_siguientes import IndiceSufijos
+
 class AnalizadorLL1:
-    def __init__(self, gramatica, primeros, siguientes):
+    def __init__(self, gramatica, primeros, siguientes, indice=None):
         self.gramatica = gramatica
         self.primeros = primeros
         self.siguientes = siguientes
+        # FIRST/anulable de los sufijos de cada producción
+        self.indice = indice if indice is not None else IndiceSufijos(gramatica, primeros)
         self.tabla_analisis = None
         self.error_conflicto = None
+        self.conflictos = {}  # (no_terminal, terminal) -> [rhs en conflicto...]
 
         try:
             self.tabla_analisis = self._construir_tabla()
@@ -26,44 +31,26 @@ class AnalizadorLL1:
 
         for lhs in self.gramatica.no_terminales:
             for rhs in self.gramatica.obtener_producciones(lhs):
-                primeros_rhs = self._primeros_de_secuencia(rhs)
-
                 # Caso normal: símbolos terminales en FIRST(rhs)
-                for term in primeros_rhs - {'e'}:
-                    if term in tabla[lhs]:
-                        raise ValueError(
-                            f"Conflicto LL(1): múltiple predicción para [{lhs}, {term}]"
-                        )
-                    tabla[lhs][term] = rhs
+                prediccion = set(self.indice.primeros(lhs, rhs))
 
                 # Caso especial: producción puede derivar epsilon
-                if 'e' in primeros_rhs:
-                    for term in self.siguientes[lhs]:
-                        if term in tabla[lhs]:
-                            raise ValueError(
-                                f"Conflicto LL(1): múltiple predicción para [{lhs}, {term}]"
-                            )
+                if self.indice.anulable(lhs, rhs):
+                    prediccion |= self.siguientes[lhs]
+
+                for term in prediccion:
+                    if term in tabla[lhs]:
+                        # Se registran todos los conflictos, no solo el primero
+                        self.conflictos.setdefault((lhs, term), [tabla[lhs][term]]).append(rhs)
+                    else:
                         tabla[lhs][term] = rhs
-        return tabla
 
-    # ==========================================================
-    #                 FUNCIONES AUXILIARES
-    # ==========================================================
-    def _primeros_de_secuencia(self, secuencia):
-        """
-        Calcula FIRST de una secuencia (rhs) completa.
-        """
-        if not secuencia:
-            return {'e'}
-
-        resultado = set()
-        for simbolo in secuencia:
-            resultado |= (self.primeros[simbolo] - {'e'})
-            if 'e' not in self.primeros[simbolo]:
-                break
-        else:
-            resultado.add('e')
-        return resultado
+        if self.conflictos:
+            lhs, term = next(iter(self.conflictos))
+            raise ValueError(
+                f"Conflicto LL(1): múltiple predicción para [{lhs}, {term}]"
+            )
+        return tabla
 
     def es_ll1(self):
         return self.tabla_analisis is not None
@@ -79,9 +66,7 @@ class AnalizadorLL1:
         if not self.es_ll1():
             return False
 
-        import re
-        SYM_RE = re.compile(r"id|[A-Za-z]+'|[A-Za-z]+|[()+*]|\$")
-        tokens = SYM_RE.findall(cadena_entrada.replace(" ", ""))
+        tokens = self.gramatica.tokenizar(cadena_entrada)
 
         if not tokens or tokens[-1] != '$':
             tokens.append('$')
@@ -9,31 +9,78 @@ Compatible con:
  - conjuntos FIRST y FOLLOW calculados externamente
 """
 
-from collections import defaultdict, deque
+import sys
+from collections import defaultdict
+
+
+def _hijos(obj):
+    if isinstance(obj, dict):
+        return list(obj.keys()) + list(obj.values())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return list(obj)
+    return []
+
+
+def _alcanzables(raiz):
+    """ Objetos alcanzables desde raiz a través de su __dict__ y colecciones. """
+    vistos = {}
+    pendientes = [raiz, raiz.__dict__]
+    while pendientes:
+        obj = pendientes.pop()
+        if id(obj) not in vistos:
+            vistos[id(obj)] = obj
+            pendientes.extend(_hijos(obj))
+    return vistos.values()
+
 
 class AnalizadorSLR1:
-    def __init__(self, gramatica, primeros, siguientes):
+    def __init__(self, gramatica, primeros, siguientes, perezoso=False, progreso=None, compacto=False):
+        """
+        perezoso: si es True, los estados LR(0), sus cierres y sus filas
+        ACTION/GOTO se materializan bajo demanda durante `analizar`.
+        `completar()` construye el resto cuando se necesita la tabla completa.
+        progreso: callback opcional progreso(etapa, **datos) durante la construcción.
+        compacto: si es True, no se guardan los cierres de los estados (solo
+        sus kernels) ni `transitions` (se derivan de las tablas), las celdas
+        de ACTION son tuplas compartidas y al completar se liberan PRIMEROS,
+        FOLLOW y los índices de construcción. Pensado para analizadores que
+        se mantienen en caché.
+        """
         self.g = gramatica
         self.primeros = primeros
         self.follow = siguientes  # FOLLOW(A) se usa para reducciones
         self.aug_inicio = self._augmentar_inicio(self.g.simbolo_inicio)
+        self.perezoso = perezoso
+        self.compacto = compacto
 
         # Estructuras de autómata
-        self.items = []            # lista de conjuntos LR(0) (cada uno es frozenset de items)
-        self.transitions = {}      # (idx_estado, simbolo) -> idx_estado
+        self.kernels = []          # kernel de cada estado (tupla ordenada de ítems codificados)
+        self.items = []            # lista de conjuntos LR(0) (None si no se cerró o no se guarda)
+        self.transitions = None if compacto else {}  # (idx_estado, simbolo) -> idx_estado
         self.tabla_action = {}     # estado -> { terminal : [acciones...] }
         self.tabla_goto = {}       # estado -> { no_terminal : estado }
+        self.conflictos = []
         self.error_conflicto = None
+        self.completo = False
+
+        self._indice_estados = {}  # kernel -> idx_estado
+        self._filas_listas = set() # estados con filas ACTION/GOTO construidas
+        self._celdas = {}          # celdas de ACTION compartidas (modo compacto)
 
         # Construcción
-        self._construir_automata_lr0()
-        self._construir_tablas_slr()
+        self._numerar_producciones()
+        # I0 = CLOSURE(S' -> • S)  (producción 0, punto en 0)
+        self._registrar_estado((0,))
+        if not perezoso:
+            self.completar(progreso)
 
     # ==========================
     #   Representación de ítems
     # ==========================
     # Ítem LR(0): (A, rhs_tuple, dot_pos)
     #   A -> α • β   se representa con dot_pos=len(α)
+    # Internamente cada ítem se codifica como un entero p * base + dot,
+    # donde p es el número de producción (0 = S' -> S).
 
     def _augmentar_inicio(self, S):
         # S' -> S
@@ -42,109 +89,178 @@ class AnalizadorSLR1:
             aug += "'"
         return aug
 
-    def _items_de(self, no_terminal):
-        """ Devuelve lista de (A, rhs) para A=no_terminal """
-        return [(no_terminal, rhs) for rhs in self.g.obtener_producciones(no_terminal)]
-
-    def _closure(self, I):
+    def _closure(self, kernel):
         """
-        Cierre LR(0) clásico.
-        I: set de ítems (A, rhs, dot)
+        Cierre LR(0) clásico sobre ítems codificados.
         """
-        cambiando = True
-        I = set(I)
-        while cambiando:
-            cambiando = False
-            # Recorremos copia estática para poder añadir
-            for (A, rhs, dot) in list(I):
-                # ¿Punto antes de un no terminal?
-                if dot < len(rhs):
-                    X = rhs[dot]
-                    if X in self.g.no_terminales:
-                        for (B, beta) in self._items_de(X):
-                            itm = (B, beta, 0)
-                            if itm not in I:
-                                I.add(itm)
-                                cambiando = True
-        return frozenset(I)
-
-    def _goto(self, I, X):
+        base = self._base
+        I = set(kernel)
+        pendientes = list(kernel)
+        while pendientes:
+            p, dot = divmod(pendientes.pop(), base)
+            rhs = self._prods[p][1]
+            # ¿Punto antes de un no terminal?
+            if dot < len(rhs):
+                for q in self._prods_de.get(rhs[dot], ()):
+                    itm = q * base
+                    if itm not in I:
+                        I.add(itm)
+                        pendientes.append(itm)
+        return I
+
+    def _decodificar(self, I):
+        """ Convierte ítems codificados en tuplas (A, rhs, dot). """
+        base = self._base
+        resultado = set()
+        for itm in I:
+            p, dot = divmod(itm, base)
+            A, rhs = self._prods[p]
+            resultado.add((A, rhs, dot))
+        return frozenset(resultado)
+
+    def _registrar_estado(self, kernel):
         """
-        GOTO(I, X) = CLOSURE({A -> αX•β | A->α•Xβ ∈ I})
+        Devuelve el índice del estado con ese kernel, creándolo si no existe.
+        El kernel identifica al estado: su cierre solo añade ítems con dot=0.
         """
-        J = set()
-        for (A, rhs, dot) in I:
-            if dot < len(rhs) and rhs[dot] == X:
-                J.add((A, rhs, dot + 1))
-        if not J:
-            return None
-        return self._closure(J)
-
-    def _construir_automata_lr0(self):
+        j = self._indice_estados.get(kernel)
+        if j is None:
+            j = len(self.kernels)
+            self.kernels.append(kernel)
+            self.items.append(None)
+            self._indice_estados[kernel] = j
+        return j
+
+    def _expandir_estado(self, i):
         """
-        Construye la colección canónica de conjuntos LR(0) y las transiciones.
+        Calcula CLOSURE del estado i y sus transiciones (registrando los
+        estados destino solo por su kernel, sin cerrarlos todavía).
+        Devuelve (cierre, {simbolo: estado_destino}).
         """
-        # Producción aumentada: S' -> S
-        prod_aug = {self.aug_inicio: [(self.g.simbolo_inicio,)]}
-        # Integramos temporalmente en una gramatica de lectura
-        # (no tocamos self.g.producciones)
-        def producciones_de(A):
-            if A == self.aug_inicio:
-                return [tuple(p) for p in prod_aug[A]]
-            return self.g.obtener_producciones(A)
-
-        # I0 = CLOSURE(S' -> • S)
-        I0 = self._closure({(self.aug_inicio, (self.g.simbolo_inicio,), 0)})
-        self.items = [I0]
-        pendientes = deque([0])
-        self.transitions = {}
+        base = self._base
+        I = self._closure(self.kernels[i])
+
+        # Kernels destino: lo que aparece justo después del punto
+        destinos = defaultdict(list)
+        for itm in I:
+            p, dot = divmod(itm, base)
+            rhs = self._prods[p][1]
+            if dot < len(rhs):
+                destinos[rhs[dot]].append(itm + 1)
+
+        sucesores = {}
+        for X, J in destinos.items():
+            j = self._registrar_estado(tuple(sorted(J)))
+            sucesores[X] = j
+            if self.transitions is not None:
+                self.transitions[(i, X)] = j
+        return I, sucesores
 
+    def _materializar(self, i):
+        """
+        Materializa (una sola vez) el cierre, transiciones y filas del estado i.
+        """
+        if i in self._filas_listas:
+            return
+        I, sucesores = self._expandir_estado(i)
+        self._construir_fila(i, I, sucesores)
+        if not self.compacto:
+            self.items[i] = self._decodificar(I)
+
+    def _construir_automata_lr0(self, progreso=None):
+        """
+        Construye la colección canónica de conjuntos LR(0), las transiciones
+        y las filas ACTION/GOTO de cada estado.
+        """
+        # Los estados se numeran en orden de descubrimiento (BFS desde I0)
+        i = 0
+        while i < len(self.kernels):
+            self._materializar(i)
+            i += 1
+            if progreso is not None and i % 100 == 0:
+                progreso("estados_lr0", estados=i)
+        if progreso is not None:
+            progreso("estados_lr0", estados=i)
+
+    def completar(self, progreso=None):
+        """
+        Construye todos los estados y las tablas completas (necesario para la
+        respuesta de la API y para detectar todos los conflictos).
+        """
+        if self.completo:
+            return
+        self._construir_automata_lr0(progreso)
+        self.completo = True
+        if self.compacto:
+            self._liberar()
+        if progreso is not None:
+            progreso("tablas_slr1", estados=len(self.kernels))
+
+    def _liberar(self):
+        """
+        Suelta lo que solo hace falta durante la construcción.
+        """
+        self.primeros = None
+        self.follow = None
+        self.prod_index = None
+        self._indice_estados = None
+        self._celdas = None
+        # Todos los estados tienen fila; un range no ocupa memoria por estado
+        self._filas_listas = range(len(self.kernels))
+
+    def estadisticas(self):
+        """ Cuántos estados se descubrieron y cuántos se materializaron. """
+        return {
+            "estados_descubiertos": len(self.kernels),
+            "estados_materializados": len(self._filas_listas),
+            "completo": self.completo,
+        }
+
+    def huella_memoria(self):
+        """
+        Bytes aproximados que ocupa este analizador (sin contar la gramática,
+        que es compartida).
+        """
+        vistos = set()
+        for obj in _alcanzables(self.g):
+            vistos.add(id(obj))
+        pendientes = [self.__dict__]
+        total = sys.getsizeof(self)
         while pendientes:
-            i = pendientes.popleft()
-            I = self.items[i]
-
-            # Símbolos candidatos desde I: lo que aparece justo después del punto
-            simbolos = set()
-            for (A, rhs, dot) in I:
-                if dot < len(rhs):
-                    simbolos.add(rhs[dot])
-
-            for X in simbolos:
-                J = self._goto(I, X)
-                if J is None:
-                    continue
-                # ¿Existe ya?
-                if J in self.items:
-                    j = self.items.index(J)
-                else:
-                    self.items.append(J)
-                    j = len(self.items) - 1
-                    pendientes.append(j)
-                self.transitions[(i, X)] = j
+            obj = pendientes.pop()
+            if id(obj) in vistos:
+                continue
+            vistos.add(id(obj))
+            total += sys.getsizeof(obj)
+            pendientes.extend(_hijos(obj))
+        return total
 
-        # Inicializar estructuras de tablas
-        for i in range(len(self.items)):
-            self.tabla_action[i] = defaultdict(list)
-            self.tabla_goto[i] = {}
+    def transiciones(self):
+        """
+        Pares ((estado, simbolo), destino) del autómata LR(0).
+        En modo compacto se reconstruyen a partir de ACTION y GOTO.
+        """
+        if self.transitions is not None:
+            return self.transitions.items()
+        pares = []
+        for i, fila in self.tabla_goto.items():
+            for X, j in fila.items():
+                pares.append(((i, X), j))
+        for i, fila in self.tabla_action.items():
+            for a, acciones in fila.items():
+                for x in acciones:
+                    if x.startswith("shift"):
+                        pares.append(((i, a), int(x.split()[1])))
+        return pares
 
     # ==========================
     #    Construcción SLR(1)
     # ==========================
-        # ==========================
-    #    Construcción SLR(1)
-    # ==========================
-    def _construir_tablas_slr(self):
+    def _numerar_producciones(self):
         """
-        ACTION y GOTO según SLR(1):
-        - shift si existe GOTO por un terminal
-        - reduce A -> α si el ítem A->α• está en I y, para todo a∈FOLLOW(A), ACTION[i,a] = reduce A->α
-        - accept si el ítem S'->S• está en I
+        Numera las producciones según el orden original de la gramática.
+        La producción 0 es la aumentada S' -> S.
         """
-        conflictos = []
-
-        # ==========================
-        # Numerar producciones según el orden original de la gramática
-        # ==========================
         self.producciones_numeradas = []
         self.prod_index = {}
 
@@ -152,71 +268,87 @@ class AnalizadorSLR1:
             self.producciones_numeradas.append((A, rhs))
             self.prod_index[(A, tuple(rhs))] = idx
 
-        # ==========================
-        # Conjuntos útiles
-        # ==========================
-        terminals = set(self.g.terminales) - {'$'}   # agregaremos $ aparte para accept
-        terminals.add('$')  # para accept
-
-        for i, I in enumerate(self.items):
-
-            # 1) shifts por terminales
-            for a in terminals:
-                if (i, a) in self.transitions:
-                    j = self.transitions[(i, a)]
-                    self._add_action(i, a, f"shift {j}", conflictos)
-
-            # 2) gotos por no terminales
-            for A in self.g.no_terminales.union({self.aug_inicio}):
-                if (i, A) in self.transitions:
-                    j = self.transitions[(i, A)]
-                    if A != self.aug_inicio:  # no mostramos goto de S'
-                        self.tabla_goto[i][A] = j
-
-            # 3) reducciones y accept
-            for (A, rhs, dot) in I:
-                # A -> α • (punto al final)
-                if dot == len(rhs):
-                    if A == self.aug_inicio:
-                        # S' -> S • ⇒ accept sobre $
-                        self._add_action(i, '$', "accept", conflictos)
-                        continue
-
-                    # reduce A -> rhs sobre cada a ∈ FOLLOW(A)
-                    rhs_texto = " ".join(rhs) if rhs else "e"
-
-                    # buscar número de producción en el mapa
-                    num_prod = self.prod_index.get((A, tuple(rhs)))
-                    if num_prod is None:
-                        acc = f"reduce ? ({A} -> {rhs_texto})"
-                    else:
-                        acc = f"reduce {num_prod}"
-
-                    for a in sorted(self.follow.get(A, set())):
-                        self._add_action(i, a, acc, conflictos)
-
-        # Guardar conflictos si hubo
-        if conflictos:
-            self.error_conflicto = conflictos[0]
+        self._prods = [(self.aug_inicio, (self.g.simbolo_inicio,))] + self.producciones_numeradas
+        self._prods_de = defaultdict(list)
+        for p, (A, _) in enumerate(self._prods):
+            self._prods_de[A].append(p)
+        self._prods_de = dict(self._prods_de)
+        self._base = max(len(rhs) for _, rhs in self._prods) + 1
+
+    def _construir_fila(self, i, I, sucesores):
+        """
+        ACTION[i] y GOTO[i] según SLR(1):
+        - shift si existe GOTO por un terminal
+        - reduce A -> α si el ítem A->α• está en I y, para todo a∈FOLLOW(A), ACTION[i,a] = reduce A->α
+        - accept si el ítem S'->S• está en I
+        """
+        self.tabla_action[i] = defaultdict(list)
+        self.tabla_goto[i] = {}
+
+        for X, j in sucesores.items():
+            if X in self.g.no_terminales:
+                # 2) gotos por no terminales
+                self.tabla_goto[i][X] = j
+            else:
+                # 1) shifts por terminales
+                self._add_action(i, X, f"shift {j}")
+
+        # 3) reducciones y accept
+        for itm in I:
+            p, dot = divmod(itm, self._base)
+            A, rhs = self._prods[p]
+            # A -> α • (punto al final)
+            if dot == len(rhs):
+                if p == 0:
+                    # S' -> S • ⇒ accept sobre $
+                    self._add_action(i, '$', "accept")
+                    continue
+
+                # reduce A -> rhs sobre cada a ∈ FOLLOW(A)
+                # (p coincide con el número de producción de prod_index)
+                acc = f"reduce {p}"
+                for a in sorted(self.follow.get(A, set())):
+                    self._add_action(i, a, acc)
 
         # Eliminar llaves vacías en ACTION
-        for i in range(len(self.items)):
+        if self.compacto:
+            # Celdas inmutables y compartidas entre estados
+            self.tabla_action[i] = {
+                a: self._celdas.setdefault(tuple(v), tuple(v))
+                for a, v in self.tabla_action[i].items()
+            }
+        else:
             self.tabla_action[i] = dict(self.tabla_action[i])
+        self._filas_listas.add(i)
 
     # -------------------------------------------------
-    def _add_action(self, i, a, accion, conflictos):
+    def _add_action(self, i, a, accion):
         """
         Inserta una acción en ACTION[i][a] detectando conflictos S/R o R/R.
         """
+        # Las mismas acciones se repiten en muchas celdas: se comparte el string
+        accion = sys.intern(accion)
         celdas = self.tabla_action[i][a]
         if celdas and accion not in celdas:
             # Conflicto
-            conflictos.append(f"Conflicto SLR(1) en estado {i}, símbolo '{a}': {celdas} vs {accion}")
+            self.conflictos.append(f"Conflicto SLR(1) en estado {i}, símbolo '{a}': {celdas} vs {accion}")
+            # Guardar el primer conflicto
+            if self.error_conflicto is None:
+                self.error_conflicto = self.conflictos[0]
         if accion not in celdas:
             celdas.append(accion)
 
+    def items_de_estado(self, i):
+        """ Conjunto de ítems (cerrado) del estado i. """
+        self._materializar(i)
+        if self.items[i] is not None:
+            return self.items[i]
+        # Modo compacto: el cierre se recalcula desde el kernel
+        return self._decodificar(self._closure(self.kernels[i]))
+
     def es_slr1(self):
         # Es SLR(1) si no hubo conflictos
+        # (en modo perezoso solo es definitivo después de completar())
         return self.error_conflicto is None
 
     # ==========================
@@ -225,13 +357,13 @@ class AnalizadorSLR1:
     def analizar(self, cadena_entrada):
         """
         Analiza usando las tablas ACTION/GOTO (shift-reduce).
-        cadena_entrada: string de símbolos (caracteres), se agrega '$' si falta.
+        cadena_entrada: string de terminales, se agrega '$' si falta.
         """
         if not self.es_slr1():
             return False
 
-        # Tokenización simple compatible con tu frontend actual
-        tokens = list(cadena_entrada)
+        # Misma tokenización que el analizador LL(1)
+        tokens = self.g.tokenizar(cadena_entrada)
         if not tokens or tokens[-1] != '$':
             tokens.append('$')
 
@@ -243,9 +375,15 @@ class AnalizadorSLR1:
             estado = pila[-1]
             a = tokens[i] if i < len(tokens) else '$'
 
+            if self.perezoso:
+                self._materializar(estado)
+
             accion = self.tabla_action.get(estado, {}).get(a, [])
             if not accion:
                 return False
+            if len(accion) > 1:
+                # Conflicto descubierto al materializar el estado
+                return False
 
             # Preferimos 'accept' > shift > reduce si hubiera más de una (no debería si es SLR(1))
             if "accept" in accion:
@@ -263,10 +401,9 @@ class AnalizadorSLR1:
             # Si hay reduce
             if any(x.startswith("reduce") for x in accion):
                 act = next(x for x in accion if x.startswith("reduce"))
-                # reduce A,alpha
-                _, resto = act.split(" ", 1)
-                A, rhs_txt = resto.split(",", 1)
-                rhs = [] if rhs_txt.strip() == "e" else rhs_txt.strip().split()
+                # reduce n  (n = número de producción, desde 1)
+                _, num = act.split(" ", 1)
+                A, rhs = self.producciones_numeradas[int(num) - 1]
 
                 # Pop por |rhs|
                 k = len(rhs)
@@ -1,20 +1,101 @@
+import time
+_inicio_importacion = time.perf_counter()
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
-import os, re
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from contextlib import asynccontextmanager
+import asyncio, importlib, logging, os, re, threading
+from collections import OrderedDict
 
 # --- Importar módulos ---
-from gramatica import Gramatica
-from primeros_siguientes import CalculadorPrimerosSiguientes
-from analizador_ll1 import AnalizadorLL1
-from analizador_slr1 import AnalizadorSLR1
+# La pila de análisis (gramatica, primeros_siguientes, analizadores) se
+# importa bajo demanda en construir_analisis() o durante el precalentamiento.
+from trabajos import GestorTrabajos, ColaLlena, TrabajoCancelado
+
+logger = logging.getLogger("uvicorn.error")
+
+
+# -------------------------------------------------
+# Arranque: precalentamiento y readiness
+# -------------------------------------------------
+# Pila de análisis que el precalentamiento importa por adelantado
+MODULOS_ANALISIS = (
+    "gramatica", "primeros_siguientes", "analizador_ll1",
+    "analizador_slr1", "analizador_conflictos",
+)
+# PF_PRECALENTAR: rutas de artefactos precompilados (ver artefactos.py)
+# separadas por os.pathsep, que se cargan en la caché al arrancar.
+estado_arranque = {
+    "listo": False,
+    "fallido": False,
+    "importacion_s": None,
+    "precalentamiento_s": None,
+    "gramaticas": 0,
+    "errores": [],
+}
+
+
+def precalentar(rutas):
+    """
+    Importa la pila de análisis y carga los artefactos en la caché.
+    Un artefacto inválido se registra en `errores` y se omite; si falla
+    algo más (p. ej. la importación), el arranque queda marcado como
+    fallido y /api/listo sigue respondiendo 503.
+    """
+    t0 = time.perf_counter()
+    if len(rutas) > MAX_CACHE_GRAMATICAS:
+        logger.warning(
+            "PF_PRECALENTAR lista %d artefactos pero la caché admite %d "
+            "(PF_CACHE_GRAMATICAS); solo quedarán los últimos.",
+            len(rutas), MAX_CACHE_GRAMATICAS,
+        )
+    try:
+        for modulo in MODULOS_ANALISIS:
+            importlib.import_module(modulo)
+        import artefactos
+
+        for ruta in rutas:
+            try:
+                texto, analisis = artefactos.cargar(ruta)
+                clave = clave_cache(texto)
+            except Exception as e:
+                estado_arranque["errores"].append(f"{ruta}: {e}")
+                logger.warning("No se pudo cargar el artefacto %s: %s", ruta, e)
+                continue
+            guardar_en_cache(clave, analisis)
+            estado_arranque["gramaticas"] += 1
+
+        estado_arranque["listo"] = True
+    except Exception as e:
+        estado_arranque["fallido"] = True
+        estado_arranque["errores"].append(f"precalentamiento: {e}")
+        logger.exception("Falló el precalentamiento")
+    finally:
+        estado_arranque["precalentamiento_s"] = round(time.perf_counter() - t0, 4)
+        logger.info(
+            "Precalentamiento: %d gramáticas en %.3f s",
+            estado_arranque["gramaticas"], estado_arranque["precalentamiento_s"],
+        )
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    estado_arranque["importacion_s"] = round(TIEMPO_IMPORTACION, 4)
+    logger.info("Importación de la API: %.3f s", TIEMPO_IMPORTACION)
+
+    rutas = [r for r in os.environ.get("PF_PRECALENTAR", "").split(os.pathsep) if r.strip()]
+    # En segundo plano: el servidor responde mientras /api/listo indica 503
+    calentamiento = asyncio.create_task(asyncio.to_thread(precalentar, rutas))
+    yield
+    await calentamiento
+    gestor_trabajos.cerrar()
 
 
 # -------------------------------------------------
 # Configuración de la app
 # -------------------------------------------------
-app = FastAPI(title="API de Análisis de Gramáticas", version="1.1")
+app = FastAPI(title="API de Análisis de Gramáticas", version="1.1", lifespan=ciclo_de_vida)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,14 +106,16 @@ app.add_middleware(
 )
 
 # -------------------------------------------------
-# Servir el frontend
+# Servir el frontend (PF_SERVIR_FRONTEND=0 para workers solo de API)
 # -------------------------------------------------
 frontend_path = os.path.join(os.path.dirname(__file__), "frontend")
-app.mount("/frontend", StaticFiles(directory=frontend_path), name="frontend")
+if os.environ.get("PF_SERVIR_FRONTEND", "1") != "0":
+    from fastapi.staticfiles import StaticFiles
+    app.mount("/frontend", StaticFiles(directory=frontend_path), name="frontend")
 
-@app.get("/")
-def root():
-    return FileResponse(os.path.join(frontend_path, "index.html"))
+    @app.get("/")
+    def root():
+        return FileResponse(os.path.join(frontend_path, "index.html"))
 
 
 # -------------------------------------------------
@@ -110,87 +193,327 @@ def parsear_gramatica(texto: str):
     return producciones
 
 
+# -------------------------------------------------
+# Construcción del resultado (compartida por el endpoint y los trabajos)
+# -------------------------------------------------
+# Gramáticas ya construidas, por texto (LRU). Los analizadores SLR(1) se
+# guardan en modo compacto para que muchas gramáticas quepan en memoria.
+MAX_CACHE_GRAMATICAS = int(os.environ.get("PF_CACHE_GRAMATICAS", "64"))
+_cache_gramaticas = OrderedDict()
+# Reconocedores SLR(1) perezosos para /api/reconocer (mismo límite)
+_cache_reconocedores = OrderedDict()
+_cache_lock = threading.Lock()
+# Límites de la búsqueda de ejemplos de conflictos (ver analizador_conflictos.py)
+CONFLICTOS_TIEMPO = float(os.environ.get("PF_CONFLICTOS_TIEMPO", "1.0"))
+CONFLICTOS_BUSQUEDA = int(os.environ.get("PF_CONFLICTOS_BUSQUEDA", "20000"))
+
+
+def guardar_en_cache(clave, valor, cache=None):
+    """ Inserta en una caché LRU descartando las entradas más antiguas. """
+    cache = _cache_gramaticas if cache is None else cache
+    with _cache_lock:
+        cache[clave] = valor
+        cache.move_to_end(clave)
+        while len(cache) > MAX_CACHE_GRAMATICAS:
+            cache.popitem(last=False)
+
+
+def clave_cache(texto_gramatica: str):
+    """ Texto normalizado (sin líneas vacías ni espacios en los extremos). """
+    return "\n".join(l.strip() for l in texto_gramatica.splitlines() if l.strip())
+
+
+def construir_analisis(texto_gramatica: str, progreso=None):
+    """
+    Construye gramática, FIRST/FOLLOW, tablas LL(1)/SLR(1) y conflictos.
+    Devuelve un dict con la parte del resultado que no depende de la cadena
+    y los analizadores (`ll1`, `slr1`). Usa la caché si la gramática ya se
+    construyó antes.
+    progreso: callback opcional progreso(etapa, **datos).
+    """
+    clave = clave_cache(texto_gramatica)
+    with _cache_lock:
+        analisis = _cache_gramaticas.get(clave)
+        if analisis is not None:
+            _cache_gramaticas.move_to_end(clave)
+            return analisis
+
+    from gramatica import Gramatica
+    from primeros_siguientes import CalculadorPrimerosSiguientes
+    from analizador_ll1 import AnalizadorLL1
+    from analizador_slr1 import AnalizadorSLR1
+    from analizador_conflictos import AnalizadorConflictos
+
+    avisar = progreso or (lambda etapa, **datos: None)
+
+    dict_prod = parsear_gramatica(texto_gramatica)
+    g = Gramatica(dict_prod)
+    avisar("gramatica", producciones=len(g.obtener_todas_producciones()))
+
+    # Calcular FIRST y FOLLOW
+    calc = CalculadorPrimerosSiguientes(g)
+    primeros = calc.calcular_primeros()
+    siguientes = calc.calcular_siguientes()
+    avisar("primeros_siguientes")
+
+    # Crear analizadores LL(1) y SLR(1)
+    ll1 = AnalizadorLL1(g, primeros, siguientes, calc.indice_sufijos())
+    avisar("tabla_ll1")
+    slr1 = AnalizadorSLR1(g, primeros, siguientes, progreso=progreso, compacto=True)
+
+    # Todos los conflictos de ambas tablas, con ejemplos mínimos
+    conflictos = AnalizadorConflictos(
+        g, ll1, slr1,
+        limite_tiempo=CONFLICTOS_TIEMPO,
+        limite_busqueda=CONFLICTOS_BUSQUEDA,
+    ).analizar()
+    avisar("conflictos", total=len(conflictos["ll1"]) + len(conflictos["slr1"]))
+
+    # Filtrar solo no terminales
+    primeros_filtrados = {
+        nt: sorted(list(v - {'$'}))
+        for nt, v in primeros.items() if nt in g.no_terminales
+    }
+    siguientes_filtrados = {
+        nt: sorted(list(v - {'e', 'ε'}))
+        for nt, v in siguientes.items() if nt in g.no_terminales
+    }
+
+    base = {
+        "gramatica": str(g),
+        "no_terminales": sorted(list(g.no_terminales)),
+        "terminales": sorted(list(g.terminales - {'$', 'e', 'ε'})),
+        "primeros": primeros_filtrados,
+        "siguientes": siguientes_filtrados,
+        "es_ll1": ll1.es_ll1(),
+        "es_slr1": slr1.es_slr1(),
+        "tabla_ll1": ll1.tabla_analisis if ll1.es_ll1() else {},
+        "tabla_slr_action": getattr(slr1, "tabla_action", {}),
+        "tabla_slr_goto": getattr(slr1, "tabla_goto", {}),
+        "detalle_ll1": getattr(ll1, "error_conflicto", None),
+        "detalle_slr1": getattr(slr1, "error_conflicto", None),
+        "conflictos": conflictos,
+    }
+    analisis = {"base": base, "ll1": ll1, "slr1": slr1}
+
+    guardar_en_cache(clave, analisis)
+    return analisis
+
+
+def construir_resultado(texto_gramatica: str, cadena: str = "", progreso=None):
+    """
+    Resultado completo de la API: análisis de la gramática + la cadena.
+    """
+    analisis = construir_analisis(texto_gramatica, progreso)
+    ll1, slr1 = analisis["ll1"], analisis["slr1"]
+
+    resultado = dict(analisis["base"])
+    resultado.update({
+        "cadena": cadena,
+        "aceptada_ll1": None,
+        "aceptada_slr1": None,
+    })
+
+    # Analizar la cadena si existe
+    if cadena:
+        entrada = cadena if cadena.endswith('$') else cadena + '$'
+        try:
+            if ll1.es_ll1():
+                resultado["aceptada_ll1"] = ll1.analizar(entrada)
+        except Exception as e:
+            resultado["aceptada_ll1"] = f"Error: {e}"
+
+        try:
+            if slr1.es_slr1():
+                resultado["aceptada_slr1"] = slr1.analizar(entrada)
+        except Exception as e:
+            resultado["aceptada_slr1"] = f"Error: {e}"
+
+    return resultado
+
+
+def mensaje_error(e: Exception):
+    mensaje = str(e)
+    if mensaje.lower().startswith("error"):
+        mensaje = mensaje[6:].strip()
+    return f"Error {mensaje}"
+
+
+async def leer_peticion(request: Request):
+    """
+    Devuelve (datos, respuesta_error) a partir del cuerpo JSON.
+    """
+    try:
+        data = await request.json()
+    except Exception:
+        return None, JSONResponse(status_code=400, content={"error": "Error al leer el cuerpo JSON."})
+
+    if not data.get("gramatica", ""):
+        return None, JSONResponse(status_code=400, content={"error": "No se recibió ninguna gramática."})
+    return data, None
+
+
 # -------------------------------------------------
 # Endpoint principal
 # -------------------------------------------------
 @app.post("/api/analizar")
 async def analizar_gramatica(request: Request):
+    data, error = await leer_peticion(request)
+    if error:
+        return error
+
     try:
-        data = await request.json()
-    except Exception:
-        return JSONResponse(status_code=400, content={"error": "Error al leer el cuerpo JSON."})
+        resultado = construir_resultado(data.get("gramatica", ""), data.get("cadena", ""))
+        return JSONResponse(content=resultado)
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"error": mensaje_error(e)})
 
-    texto_gramatica = data.get("gramatica", "")
-    cadena = data.get("cadena", "")
 
-    if not texto_gramatica:
-        return JSONResponse(status_code=400, content={"error": "No se recibió ninguna gramática."})
+def reconocedor_slr1(texto_gramatica: str):
+    """
+    Analizador SLR(1) para solo reconocer cadenas, sin tablas completas.
+    Si la gramática ya está en la caché completa se reutiliza; si no, se
+    crea uno perezoso que materializa solo los estados que visitan las
+    cadenas y se conserva para los siguientes pedidos. Es compacto como los
+    de la caché completa: reconocer no necesita los ítems de cada estado.
+    """
+    clave = clave_cache(texto_gramatica)
+    with _cache_lock:
+        analisis = _cache_gramaticas.get(clave)
+        if analisis is not None:
+            return analisis["slr1"]
+        slr1 = _cache_reconocedores.get(clave)
+        if slr1 is not None:
+            _cache_reconocedores.move_to_end(clave)
+            return slr1
+
+    from gramatica import Gramatica
+    from primeros_siguientes import CalculadorPrimerosSiguientes
+    from analizador_slr1 import AnalizadorSLR1
+
+    g = Gramatica(parsear_gramatica(texto_gramatica))
+    calc = CalculadorPrimerosSiguientes(g)
+    slr1 = AnalizadorSLR1(
+        g, calc.calcular_primeros(), calc.calcular_siguientes(),
+        perezoso=True, compacto=True,
+    )
+    guardar_en_cache(clave, slr1, _cache_reconocedores)
+    return slr1
+
+
+@app.post("/api/reconocer")
+async def reconocer_cadena(request: Request):
+    """
+    Solo reconocimiento SLR(1): no devuelve tablas ni conflictos.
+    es_slr1 es None mientras el autómata no esté completo y no se haya
+    encontrado ningún conflicto en los estados visitados. huella_bytes es
+    la memoria aproximada del analizador guardado en la caché.
+    """
+    data, error = await leer_peticion(request)
+    if error:
+        return error
 
+    cadena = data.get("cadena", "")
     try:
-        dict_prod = parsear_gramatica(texto_gramatica)
-        g = Gramatica(dict_prod)
-
-        # Calcular FIRST y FOLLOW
-        calc = CalculadorPrimerosSiguientes(g)
-        primeros = calc.calcular_primeros()
-        siguientes = calc.calcular_siguientes()
-
-        # Crear analizadores LL(1) y SLR(1)
-        ll1 = AnalizadorLL1(g, primeros, siguientes)
-        slr1 = AnalizadorSLR1(g, primeros, siguientes)
-
-        # Filtrar solo no terminales
-        primeros_filtrados = {
-            nt: sorted(list(v - {'$'}))
-            for nt, v in primeros.items() if nt in g.no_terminales
-        }
-        siguientes_filtrados = {
-            nt: sorted(list(v - {'e', 'ε'}))
-            for nt, v in siguientes.items() if nt in g.no_terminales
-        }
-
-        resultado = {
-            "gramatica": str(g),
-            "no_terminales": sorted(list(g.no_terminales)),
-            "terminales": sorted(list(g.terminales - {'$', 'e', 'ε'})),
-            "primeros": primeros_filtrados,
-            "siguientes": siguientes_filtrados,
-            "es_ll1": ll1.es_ll1(),
-            "es_slr1": slr1.es_slr1(),
-            "tabla_ll1": ll1.tabla_analisis if ll1.es_ll1() else {},
-            "tabla_slr_action": getattr(slr1, "tabla_action", {}),
-            "tabla_slr_goto": getattr(slr1, "tabla_goto", {}),
-            "cadena": cadena,
-            "aceptada_ll1": None,
-            "aceptada_slr1": None,
-            "detalle_ll1": getattr(ll1, "error_conflicto", None),
-            "detalle_slr1": getattr(slr1, "error_conflicto", None),
-        }
-
-        # Analizar la cadena si existe
-        if cadena:
-            entrada = cadena if cadena.endswith('$') else cadena + '$'
-            try:
-                if ll1.es_ll1():
-                    resultado["aceptada_ll1"] = ll1.analizar(entrada)
-            except Exception as e:
-                resultado["aceptada_ll1"] = f"Error: {e}"
+        slr1 = reconocedor_slr1(data.get("gramatica", ""))
+        entrada = cadena if cadena.endswith('$') else cadena + '$'
+        aceptada = slr1.analizar(entrada)
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"error": mensaje_error(e)})
 
-            try:
-                if slr1.es_slr1():
-                    resultado["aceptada_slr1"] = slr1.analizar(entrada)
-            except Exception as e:
-                resultado["aceptada_slr1"] = f"Error: {e}"
+    es_slr1 = slr1.es_slr1()
+    return {
+        "cadena": cadena,
+        "aceptada_slr1": aceptada if es_slr1 else None,
+        "es_slr1": es_slr1 if (slr1.completo or not es_slr1) else None,
+        "detalle_slr1": slr1.error_conflicto,
+        "estadisticas": slr1.estadisticas(),
+        "huella_bytes": slr1.huella_memoria(),
+    }
 
-        return JSONResponse(content=resultado)
 
+# -------------------------------------------------
+# Trabajos asíncronos (gramáticas grandes)
+# -------------------------------------------------
+def _tarea_analizar(data, progreso):
+    try:
+        return construir_resultado(data.get("gramatica", ""), data.get("cadena", ""), progreso)
+    except TrabajoCancelado:
+        raise
     except Exception as e:
-        mensaje = str(e)
-        if mensaje.lower().startswith("error"):
-            mensaje = mensaje[6:].strip()
-        return JSONResponse(status_code=400, content={"error": f"Error {mensaje}"})
+        raise RuntimeError(mensaje_error(e)) from e
+
+
+gestor_trabajos = GestorTrabajos(
+    _tarea_analizar,
+    max_trabajadores=int(os.environ.get("PF_TRABAJADORES", "2")),
+    max_en_cola=int(os.environ.get("PF_MAX_EN_COLA", "16")),
+    retencion=float(os.environ.get("PF_RETENCION_TRABAJOS", "600")),
+)
+
+
+def _trabajo_no_encontrado():
+    return JSONResponse(status_code=404, content={"error": "Trabajo no encontrado o expirado."})
+
+
+@app.post("/api/trabajos")
+async def crear_trabajo(request: Request):
+    data, error = await leer_peticion(request)
+    if error:
+        return error
+
+    try:
+        trabajo = gestor_trabajos.enviar(data)
+    except ColaLlena as e:
+        return JSONResponse(status_code=503, content={"error": str(e)})
+    return JSONResponse(status_code=202, content={"id": trabajo.id, "estado": trabajo.estado})
+
+
+@app.get("/api/trabajos/{id_trabajo}")
+async def estado_trabajo(id_trabajo: str):
+    trabajo = gestor_trabajos.obtener(id_trabajo)
+    if trabajo is None:
+        return _trabajo_no_encontrado()
+    return trabajo.resumen()
+
+
+@app.get("/api/trabajos/{id_trabajo}/eventos")
+async def eventos_trabajo(id_trabajo: str):
+    trabajo = gestor_trabajos.obtener(id_trabajo)
+    if trabajo is None:
+        return _trabajo_no_encontrado()
+    return StreamingResponse(trabajo.seguir(), media_type="text/event-stream")
+
+
+@app.get("/api/trabajos/{id_trabajo}/resultado")
+async def resultado_trabajo(id_trabajo: str):
+    trabajo = gestor_trabajos.obtener(id_trabajo)
+    if trabajo is None:
+        return _trabajo_no_encontrado()
+    if trabajo.estado == "error":
+        return JSONResponse(status_code=400, content={"error": trabajo.error})
+    if trabajo.estado != "completado":
+        return JSONResponse(status_code=409, content={"id": trabajo.id, "estado": trabajo.estado})
+    return JSONResponse(content=trabajo.resultado)
+
+
+@app.delete("/api/trabajos/{id_trabajo}")
+async def cancelar_trabajo(id_trabajo: str):
+    trabajo = gestor_trabajos.cancelar(id_trabajo)
+    if trabajo is None:
+        return _trabajo_no_encontrado()
+    return {"id": trabajo.id, "estado": trabajo.estado}
 
 
 @app.get("/api/test")
 def test():
     return {"mensaje": "API funcionando correctamente"}
+
+
+@app.get("/api/listo")
+def listo():
+    """ Readiness: 503 hasta que termina el precalentamiento. """
+    return JSONResponse(status_code=200 if estado_arranque["listo"] else 503, content=estado_arranque)
+
+
+TIEMPO_IMPORTACION = time.perf_counter() - _inicio_importacion
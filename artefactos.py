@@ -0,0 +1,59 @@
+"""
+Artefactos precompilados de gramáticas para precalentar la caché de la API.
+
+Un artefacto guarda el texto de la gramática y su análisis ya construido
+(tablas, analizadores y conflictos). Al arrancar, la API carga los listados
+en PF_PRECALENTAR y responde a ese mismo texto sin reconstruir nada.
+
+Uso:
+    python artefactos.py gramatica.txt gramatica.pkl
+
+Los artefactos se leen con pickle: solo deben cargarse archivos generados
+por este mismo servicio.
+"""
+
+import pickle
+import sys
+
+# Cambia si cambia la representación de los analizadores
+VERSION = 1
+
+
+def guardar(ruta, texto_gramatica, analisis):
+    with open(ruta, "wb") as f:
+        pickle.dump(
+            {"version": VERSION, "texto": texto_gramatica, "analisis": analisis},
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+
+def cargar(ruta):
+    """
+    Devuelve (texto_gramatica, analisis) del artefacto.
+    """
+    with open(ruta, "rb") as f:
+        datos = pickle.load(f)
+    if not isinstance(datos, dict) or datos.get("version") != VERSION:
+        raise ValueError(f"versión de artefacto incompatible (se esperaba {VERSION}).")
+    return datos["texto"], datos["analisis"]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Uso: python artefactos.py gramatica.txt salida.pkl")
+        return 2
+
+    from api import construir_analisis
+
+    entrada, salida = argv
+    with open(entrada, encoding="utf-8") as f:
+        texto = f.read()
+    guardar(salida, texto, construir_analisis(texto))
+    print(f"Artefacto guardado en {salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
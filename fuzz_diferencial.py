@@ -0,0 +1,242 @@
+"""
+Prueba diferencial (fuzzing) de los analizadores LL(1) y SLR(1).
+
+Genera gramáticas aleatorias que son LL(1) y SLR(1) a la vez, deriva
+oraciones aleatorias y variantes "casi correctas" (un token borrado,
+insertado, cambiado o intercambiado), y comprueba que ambos analizadores
+respondan lo mismo. En la misma corrida mide el rendimiento de cada motor
+en tokens por segundo.
+
+Uso:
+    python fuzz_diferencial.py [--gramaticas N] [--cadenas M] [--semilla S]
+                               [--modo-slr normal|perezoso|compacto]
+
+Termina con código 1 si encuentra alguna discrepancia.
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from gramatica import Gramatica
+from primeros_siguientes import CalculadorPrimerosSiguientes
+from analizador_ll1 import AnalizadorLL1
+from analizador_slr1 import AnalizadorSLR1
+
+# Sin 'e' (epsilon) ni '$' (fin de entrada)
+TERMINALES = ['a', 'b', 'c', 'd', 'f', 'g', 'id', 'num', '+', '*', '(', ')']
+NO_TERMINALES = ['S', 'A', 'B', 'C', 'D', 'F', 'G', 'H']
+
+
+# ==========================================================
+#                 GENERACIÓN DE GRAMÁTICAS
+# ==========================================================
+def gramatica_aleatoria(rng):
+    """
+    Gramática pequeña cuyas alternativas pueden empezar por cualquier
+    símbolo (incluidos no terminales anulables) y, a veces, una alternativa
+    vacía. `construir` descarta las que no son LL(1) y SLR(1).
+    """
+    nts = NO_TERMINALES[:rng.randint(1, len(NO_TERMINALES))]
+    terminales = rng.sample(TERMINALES, rng.randint(2, 6))
+    producciones = {}
+    for nt in nts:
+        alternativas = []
+        for _ in range(rng.randint(1, 3)):
+            rhs = [rng.choice(nts + terminales) for _ in range(rng.randint(1, 4))]
+            if rhs not in alternativas:
+                alternativas.append(rhs)
+        if rng.random() < 0.3:
+            alternativas.append([])  # epsilon
+        producciones[nt] = alternativas
+    return producciones
+
+
+def construir(producciones, modo_slr):
+    """
+    Devuelve (gramatica, ll1, slr1) si la gramática es LL(1) y SLR(1);
+    None en otro caso.
+    """
+    g = Gramatica(producciones)
+    calc = CalculadorPrimerosSiguientes(g)
+    primeros = calc.calcular_primeros()
+    siguientes = calc.calcular_siguientes()
+
+    ll1 = AnalizadorLL1(g, primeros, siguientes, calc.indice_sufijos())
+    if not ll1.es_ll1():
+        return None
+    slr1 = AnalizadorSLR1(
+        g, primeros, siguientes,
+        perezoso=(modo_slr == "perezoso"),
+        compacto=(modo_slr == "compacto"),
+    )
+    if not slr1.es_slr1():
+        return None
+    if modo_slr == "perezoso":
+        # Solo para saber si es SLR(1); se usa un analizador perezoso aparte
+        slr1.completar()
+        if not slr1.es_slr1():
+            return None
+        slr1 = AnalizadorSLR1(g, primeros, siguientes, perezoso=True)
+    return g, ll1, slr1
+
+
+# ==========================================================
+#                 GENERACIÓN DE CADENAS
+# ==========================================================
+def alturas(g):
+    """
+    Altura mínima de un árbol de derivación para cada no terminal
+    (los improductivos no aparecen).
+    """
+    altura = {}
+    cambiado = True
+    while cambiado:
+        cambiado = False
+        for A, rhs in g.obtener_todas_producciones():
+            if all(X in altura or X not in g.no_terminales for X in rhs):
+                h = 1 + max((altura[X] for X in rhs if X in g.no_terminales), default=0)
+                if h < altura.get(A, h + 1):
+                    altura[A] = h
+                    cambiado = True
+    return altura
+
+
+def derivar(rng, g, altura, max_pasos):
+    """
+    Oración aleatoria del lenguaje. Después de max_pasos expansiones se
+    elige siempre la producción de menor altura para terminar.
+    """
+    def altura_rhs(rhs):
+        return max((altura.get(X, float("inf")) for X in rhs if X in g.no_terminales), default=0)
+
+    salida = []
+    pila = [g.simbolo_inicio]
+    pasos = 0
+    while pila:
+        X = pila.pop()
+        if X not in g.no_terminales:
+            salida.append(X)
+            continue
+        productivas = [rhs for rhs in g.obtener_producciones(X) if altura_rhs(rhs) != float("inf")]
+        if pasos < max_pasos:
+            rhs = rng.choice(productivas)
+        else:
+            rhs = min(productivas, key=altura_rhs)
+        pasos += 1
+        pila.extend(reversed(rhs))
+    return salida
+
+
+def casi_oracion(rng, g, tokens):
+    """ Variante con una sola mutación (puede seguir siendo válida). """
+    terminales = sorted(g.terminales - {'$'})
+    tokens = list(tokens)
+    mutacion = rng.choice(["borrar", "insertar", "cambiar", "intercambiar"])
+    if mutacion == "borrar" and tokens:
+        del tokens[rng.randrange(len(tokens))]
+    elif mutacion == "cambiar" and tokens:
+        tokens[rng.randrange(len(tokens))] = rng.choice(terminales)
+    elif mutacion == "intercambiar" and len(tokens) > 1:
+        i = rng.randrange(len(tokens) - 1)
+        tokens[i], tokens[i + 1] = tokens[i + 1], tokens[i]
+    else:
+        tokens.insert(rng.randint(0, len(tokens)), rng.choice(terminales))
+    return tokens
+
+
+# ==========================================================
+#                     CORRIDA DIFERENCIAL
+# ==========================================================
+def correr(num_gramaticas, num_cadenas, semilla, modo_slr, max_pasos=30, max_intentos=200000):
+    rng = random.Random(semilla)
+    discrepancias = []
+    tiempo = {"ll1": 0.0, "slr1": 0.0}
+    total_tokens = 0
+    total_cadenas = 0
+    gramaticas = 0
+    intentos = 0
+
+    while gramaticas < num_gramaticas and intentos < max_intentos:
+        intentos += 1
+        producciones = gramatica_aleatoria(rng)
+        construido = construir(producciones, modo_slr)
+        if construido is None:
+            continue
+        g, ll1, slr1 = construido
+        altura = alturas(g)
+        if g.simbolo_inicio not in altura:
+            continue
+        gramaticas += 1
+
+        casos = []
+        for _ in range(num_cadenas):
+            oracion = derivar(rng, g, altura, max_pasos)
+            casos.append((oracion, True))
+            casos.append((casi_oracion(rng, g, oracion), None))
+
+        for tokens, esperado in casos:
+            entrada = " ".join(tokens + ['$'])
+            total_tokens += len(tokens) + 1
+            total_cadenas += 1
+
+            t0 = time.perf_counter()
+            r_ll1 = ll1.analizar(entrada)
+            t1 = time.perf_counter()
+            r_slr1 = slr1.analizar(entrada)
+            t2 = time.perf_counter()
+            tiempo["ll1"] += t1 - t0
+            tiempo["slr1"] += t2 - t1
+
+            if r_ll1 != r_slr1 or (esperado is not None and r_ll1 != esperado):
+                discrepancias.append({
+                    "gramatica": str(g),
+                    "entrada": entrada,
+                    "esperado": esperado,
+                    "ll1": r_ll1,
+                    "slr1": r_slr1,
+                })
+
+    return {
+        "gramaticas": gramaticas,
+        "intentos": intentos,
+        "cadenas": total_cadenas,
+        "tokens": total_tokens,
+        "tokens_por_segundo": {
+            motor: (total_tokens / t if t > 0 else None) for motor, t in tiempo.items()
+        },
+        "discrepancias": discrepancias,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fuzzing diferencial LL(1) vs SLR(1)")
+    parser.add_argument("--gramaticas", type=int, default=200)
+    parser.add_argument("--cadenas", type=int, default=20, help="oraciones por gramática")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--modo-slr", choices=["normal", "perezoso", "compacto"], default="normal")
+    args = parser.parse_args(argv)
+
+    r = correr(args.gramaticas, args.cadenas, args.semilla, args.modo_slr)
+
+    print(f"Gramáticas LL(1) y SLR(1): {r['gramaticas']} (de {r['intentos']} generadas)")
+    print(f"Cadenas analizadas: {r['cadenas']} ({r['tokens']} tokens)")
+    for motor, tps in r["tokens_por_segundo"].items():
+        texto = f"{tps:,.0f}" if tps is not None else "-"
+        print(f"  {motor}: {texto} tokens/s")
+
+    if r["discrepancias"]:
+        print(f"Discrepancias: {len(r['discrepancias'])}")
+        for d in r["discrepancias"][:5]:
+            print("-" * 40)
+            print(d["gramatica"])
+            print(f"entrada: {d['entrada']!r}  esperado: {d['esperado']}  LL(1): {d['ll1']}  SLR(1): {d['slr1']}")
+        return 1
+
+    print("Sin discrepancias.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -37,6 +37,8 @@ class Gramatica:
 
         # Agregar marcador de fin
         self.terminales.add('$')
+        # Largo del terminal más largo (para tokenizar)
+        self._max_terminal = max(len(t) for t in self.terminales)
 
         # Normalizar producciones
         self._normalizar_producciones()
@@ -71,6 +73,26 @@ class Gramatica:
                 todas.append((lhs, rhs))
         return todas
 
+    def tokenizar(self, cadena):
+        """
+        Divide una cadena de entrada en terminales de la gramática.
+        Se separa por espacios y, dentro de cada trozo, se toma el terminal
+        más largo que coincida (p. ej. 'id' antes que 'i'). Un carácter que no
+        inicia ningún terminal queda como token propio (y el análisis fallará).
+        """
+        tokens = []
+        for trozo in cadena.split():
+            i = 0
+            while i < len(trozo):
+                for largo in range(min(self._max_terminal, len(trozo) - i), 0, -1):
+                    if trozo[i:i + largo] in self.terminales:
+                        break
+                else:
+                    largo = 1
+                tokens.append(trozo[i:i + largo])
+                i += largo
+        return tokens
+
     def tiene_produccion_epsilon(self, no_terminal):
         for rhs in self.producciones.get(no_terminal, []):
             if len(rhs) == 0:
@@ -7,15 +7,21 @@ class CalculadorPrimerosSiguientes:
     def __init__(self, gramatica):
         self.gramatica = gramatica
         # Marcar no terminales que pueden derivar epsilon
+        # (se completa con las derivaciones indirectas al calcular PRIMEROS)
         self.nullable = {
             nt: self.gramatica.tiene_produccion_epsilon(nt)
             for nt in self.gramatica.no_terminales
         }
+        self._primeros = None
+        self._indice = None
 
  
     #                     CÁLCULO DE PRIMEROS
 
     def calcular_primeros(self):
+        # Se calcula una sola vez por gramática
+        if self._primeros is not None:
+            return self._primeros
         primeros = {}
 
         # 1️ Inicializar terminales
@@ -61,8 +67,21 @@ class CalculadorPrimerosSiguientes:
                     if todo_epsilon and 'e' not in primeros[nt]:
                         primeros[nt].add('e')
                         cambiado = True
+
+        for nt in self.gramatica.no_terminales:
+            self.nullable[nt] = 'e' in primeros[nt]
+        self._primeros = primeros
         return primeros
 
+    def indice_sufijos(self):
+        """
+        Índice de FIRST/anulable de cada sufijo de producción (ver IndiceSufijos).
+        """
+        if self._indice is None:
+            primeros = self.calcular_primeros()
+            self._indice = IndiceSufijos(self.gramatica, primeros, self.nullable)
+        return self._indice
+
     # ==========================================================
     #                     CÁLCULO DE SIGUIENTES
     # ==========================================================
@@ -70,62 +89,79 @@ class CalculadorPrimerosSiguientes:
         siguientes = {nt: set() for nt in self.gramatica.no_terminales}
         siguientes[self.gramatica.simbolo_inicio].add('$')
 
-        primeros = self.calcular_primeros()
+        indice = self.indice_sufijos()
 
         cambiado = True
         while cambiado:
             cambiado = False
             for nt in self.gramatica.no_terminales:
                 for rhs in self.gramatica.obtener_producciones(nt):
+                    primeros_suf, desde_anulable = indice.sufijos(nt, rhs)
                     for i, simbolo in enumerate(rhs):
                         if simbolo not in self.gramatica.no_terminales:
                             continue
 
-                        # Caso 1: simbolo al final → FOLLOW(nt)
-                        if i == len(rhs) - 1:
+                        # Caso 1: hay símbolos después → FIRST(beta)
+                        for s in primeros_suf[i + 1]:
+                            if s not in siguientes[simbolo]:
+                                siguientes[simbolo].add(s)
+                                cambiado = True
+
+                        # Caso 2: simbolo al final o beta ⇒ ε → FOLLOW(nt)
+                        if i + 1 >= desde_anulable:
                             for s in siguientes[nt]:
                                 if s not in siguientes[simbolo]:
                                     siguientes[simbolo].add(s)
                                     cambiado = True
-                        else:
-                            # Caso 2: hay símbolos después → FIRST(beta)
-                            beta = rhs[i + 1:]
-                            primero_beta = self._primeros_de_secuencia(beta, primeros)
+        return siguientes
 
-                            for s in primero_beta - {'e'}:
-                                if s not in siguientes[simbolo]:
-                                    siguientes[simbolo].add(s)
-                                    cambiado = True
 
-                            # Caso 3: si beta ⇒ ε → FOLLOW(nt)
-                            if 'e' in primero_beta or 'ε' in primero_beta:
-                                for s in siguientes[nt]:
-                                    if s not in siguientes[simbolo] and s not in {'e', 'ε'}:
-                                        siguientes[simbolo].add(s)
-                                        cambiado = True
-        return siguientes
+class IndiceSufijos:
+    """
+    FIRST y anulabilidad de cada sufijo rhs[i:] de cada producción,
+    calculados una sola vez a partir de PRIMEROS y de los no terminales
+    anulables (si no se pasan, se deducen de 'e' en PRIMEROS).
 
-    # ==========================================================
-    #                    FUNCIONES AUXILIARES
-    # ==========================================================
-    def _primeros_de_secuencia(self, secuencia, primeros):
+    Por producción se guarda:
+      - una tupla de frozensets (sin 'e'), uno por posición del punto
+        0..len(rhs); los conjuntos iguales se comparten entre producciones.
+      - un entero k: el sufijo rhs[i:] deriva epsilon si y solo si i >= k.
+    """
+    def __init__(self, gramatica, primeros, nullable=None):
+        self.gramatica = gramatica
+        if nullable is None:
+            nullable = {nt: 'e' in primeros[nt] for nt in gramatica.no_terminales}
+        self._por_produccion = {}
+        compartidos = {}
+        vacio = frozenset()
+
+        for lhs, rhs in gramatica.obtener_todas_producciones():
+            conjuntos = [vacio] * (len(rhs) + 1)
+            desde_anulable = len(rhs)
+            actual = vacio
+            # Recorrido de derecha a izquierda: FIRST(X β) a partir de FIRST(β)
+            for i in range(len(rhs) - 1, -1, -1):
+                p = primeros.get(rhs[i], set())
+                if nullable.get(rhs[i], False):
+                    actual = frozenset(p - {'e'}).union(actual)
+                    if desde_anulable == i + 1:
+                        desde_anulable = i
+                else:
+                    actual = frozenset(p)
+                actual = compartidos.setdefault(actual, actual)
+                conjuntos[i] = actual
+            self._por_produccion[(lhs, rhs)] = (tuple(conjuntos), desde_anulable)
+
+    def sufijos(self, lhs, rhs):
         """
-        Devuelve FIRST de una secuencia (lista de símbolos).
+        Devuelve (conjuntos, k) de la producción lhs -> rhs.
         """
-        if not secuencia:
-            return {'e'}
-
-        resultado = set()
-        for simbolo in secuencia:
-            resultado.update(primeros.get(simbolo, set()) - {'e'})
-            if 'e' not in primeros.get(simbolo, set()):
-                break
-        else:
-            resultado.add('e')
-        return resultado
-
-    def _puede_derive_epsilon(self, simbolo, primeros):
-        return (
-            simbolo in self.gramatica.no_terminales
-            and 'e' in primeros.get(simbolo, set())
-        )
+        return self._por_produccion[(lhs, rhs)]
+
+    def primeros(self, lhs, rhs, i=0):
+        """ FIRST(rhs[i:]) sin 'e'. """
+        return self._por_produccion[(lhs, rhs)][0][i]
+
+    def anulable(self, lhs, rhs, i=0):
+        """ True si rhs[i:] deriva epsilon. """
+        return i >= self._por_produccion[(lhs, rhs)][1]
@@ -0,0 +1,195 @@
+"""
+Trabajos asíncronos para construcciones largas de gramáticas.
+
+Cada trabajo entra en una cola acotada y lo ejecuta un pool de hilos.
+Durante la construcción se publican eventos de progreso, que se pueden
+consultar o seguir por Server-Sent Events. Los trabajos terminados se
+conservan durante `retencion` segundos y luego se descartan.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TrabajoCancelado(Exception):
+    """ Se lanza dentro de la tarea cuando el trabajo fue cancelado. """
+
+
+class ColaLlena(Exception):
+    """ La cola de trabajos pendientes alcanzó su capacidad máxima. """
+
+
+class Trabajo:
+    FINALES = ("completado", "error", "cancelado")
+
+    def __init__(self, datos):
+        self.id = uuid.uuid4().hex
+        self.datos = datos
+        self.estado = "en_cola"
+        self.eventos = []
+        self.resultado = None
+        self.error = None
+        self.creado = time.time()
+        self.terminado = None
+        # Se consulta desde el hilo de trabajo (cancelación cooperativa)
+        self.cancelado = threading.Event()
+        self._cambio = asyncio.Event()
+
+    @property
+    def finalizado(self):
+        return self.estado in self.FINALES
+
+    def _publicar(self, etapa, **datos):
+        """ Agrega un evento y despierta a los suscriptores (solo desde el loop). """
+        evento = {"etapa": etapa, "t": round(time.time() - self.creado, 3)}
+        evento.update(datos)
+        self.eventos.append(evento)
+        self._cambio.set()
+        self._cambio = asyncio.Event()
+
+    def _terminar(self, estado, error=None):
+        self.estado = estado
+        self.error = error
+        self.terminado = time.time()
+        self._publicar(estado)
+
+    def resumen(self):
+        return {
+            "id": self.id,
+            "estado": self.estado,
+            "progreso": self.eventos[-1] if self.eventos else None,
+            "eventos": list(self.eventos),
+            "error": self.error,
+        }
+
+    async def seguir(self):
+        """
+        Genera los eventos en formato SSE, desde el primero, hasta que el
+        trabajo termina.
+        """
+        enviados = 0
+        while True:
+            cambio = self._cambio
+            while enviados < len(self.eventos):
+                evento = self.eventos[enviados]
+                enviados += 1
+                yield f"event: progreso\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n"
+            if self.finalizado:
+                fin = {"id": self.id, "estado": self.estado, "error": self.error}
+                yield f"event: fin\ndata: {json.dumps(fin, ensure_ascii=False)}\n\n"
+                return
+            await cambio.wait()
+
+
+class GestorTrabajos:
+    """
+    tarea: función tarea(datos, progreso) que se ejecuta en el pool de hilos.
+    progreso(etapa, **datos) publica un evento y lanza TrabajoCancelado si
+    el trabajo fue cancelado.
+    """
+    def __init__(self, tarea, max_trabajadores=2, max_en_cola=16, retencion=600, max_retenidos=256):
+        self.tarea = tarea
+        self.max_trabajadores = max_trabajadores
+        self.retencion = retencion
+        self.max_retenidos = max_retenidos
+        self.max_en_cola = max_en_cola
+        self.trabajos = OrderedDict()   # id -> Trabajo (en orden de envío)
+        # Pendientes propios (no asyncio.Queue) para poder quitar los cancelados;
+        # el semáforo cuenta avisos a los trabajadores, no trabajos.
+        self._pendientes = deque()
+        self._avisos = asyncio.Semaphore(0)
+        self._pool = None
+        self._trabajadores = []
+
+    # ==========================
+    #       Operaciones
+    # ==========================
+    def enviar(self, datos):
+        """ Encola un trabajo nuevo. Debe llamarse desde el event loop. """
+        self._purgar()
+        self._iniciar()
+        if len(self._pendientes) >= self.max_en_cola:
+            raise ColaLlena("La cola de trabajos está llena, intenta más tarde.")
+        trabajo = Trabajo(datos)
+        self._pendientes.append(trabajo)
+        self._avisos.release()
+        self.trabajos[trabajo.id] = trabajo
+        trabajo._publicar("en_cola")
+        return trabajo
+
+    def obtener(self, id_trabajo):
+        self._purgar()
+        return self.trabajos.get(id_trabajo)
+
+    def cancelar(self, id_trabajo):
+        trabajo = self.obtener(id_trabajo)
+        if trabajo is None or trabajo.finalizado:
+            return trabajo
+        trabajo.cancelado.set()
+        if trabajo.estado == "en_cola":
+            # Libera su lugar en la cola de inmediato
+            self._pendientes.remove(trabajo)
+            trabajo._terminar("cancelado")
+        return trabajo
+
+    def cerrar(self):
+        for t in self._trabajadores:
+            t.cancel()
+        self._trabajadores = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # ==========================
+    #     Ejecución interna
+    # ==========================
+    def _iniciar(self):
+        if self._trabajadores:
+            return
+        self._pool = ThreadPoolExecutor(max_workers=self.max_trabajadores, thread_name_prefix="trabajo")
+        loop = asyncio.get_running_loop()
+        self._trabajadores = [loop.create_task(self._trabajador()) for _ in range(self.max_trabajadores)]
+
+    async def _trabajador(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._avisos.acquire()
+            if not self._pendientes:
+                # El aviso era de un trabajo que se canceló en la cola
+                continue
+            trabajo = self._pendientes.popleft()
+            trabajo.estado = "ejecutando"
+            trabajo._publicar("ejecutando")
+
+            def progreso(etapa, _trabajo=trabajo, **datos):
+                if _trabajo.cancelado.is_set():
+                    raise TrabajoCancelado()
+                loop.call_soon_threadsafe(lambda: _trabajo._publicar(etapa, **datos))
+
+            try:
+                resultado = await loop.run_in_executor(
+                    self._pool, self.tarea, trabajo.datos, progreso
+                )
+                if trabajo.cancelado.is_set():
+                    raise TrabajoCancelado()
+                trabajo.resultado = resultado
+                trabajo._terminar("completado")
+            except TrabajoCancelado:
+                trabajo._terminar("cancelado")
+            except Exception as e:
+                trabajo._terminar("error", str(e))
+
+    def _purgar(self):
+        """ Descarta trabajos terminados cuya retención expiró. """
+        ahora = time.time()
+        terminados = [t for t in self.trabajos.values() if t.finalizado]
+        sobrantes = len(terminados) - self.max_retenidos
+        for t in terminados:
+            if sobrantes > 0 or ahora - t.terminado > self.retencion:
+                del self.trabajos[t.id]
+                sobrantes -= 1